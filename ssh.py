@@ -6,778 +6,915 @@ Compatible with pwnagotchi-torch-plugins architecture
 """
 
 import logging
+import math
 import subprocess
 import json
 import os
 import time
 import threading
-import queue
-import signal
 import pty
 import select
+import selectors
+import errno
 import termios
 import struct
 import fcntl
+import socket
+import re
+import shutil
+import hashlib
+import gzip
+import codecs
+import functools
+import collections
 from datetime import datetime
 
+try:
+    import dbus
+except ImportError:
+    dbus = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from rjsmin import jsmin
+except ImportError:
+    jsmin = None
+
+try:
+    from rcssmin import cssmin
+except ImportError:
+    cssmin = None
+
 import pwnagotchi
 import pwnagotchi.plugins as plugins
 import pwnagotchi.ui.fonts as fonts
 from pwnagotchi.ui.components import LabeledValue
 from pwnagotchi.ui.view import BLACK
 
-from flask import render_template_string, request, jsonify, abort
+import jinja2
+from markupsafe import Markup
+from flask import Response, request, abort
+from werkzeug.exceptions import RequestEntityTooLarge
 
 
-class WebTerminalSession:
-    """Enhanced web terminal session with better error handling and features"""
-    
-    def __init__(self, session_id):
-        self.session_id = session_id
-        self.active = True
-        self.created_at = time.time()
-        self.last_activity = time.time()
-        self.output_buffer = queue.Queue(maxsize=1000)
-        self.command_history = []
-        
-        # Platform-specific initialization
-        import platform
-        self.platform = platform.system().lower()
-        
-        if self.platform == "windows":
-            self._init_windows_terminal()
-        else:
-            self._init_unix_terminal()
-    
-    def _init_windows_terminal(self):
-        """Initialize Windows terminal using PowerShell"""
-        try:
-            # Try PowerShell Core first, then Windows PowerShell
-            for ps_cmd in ['pwsh.exe', 'powershell.exe']:
-                try:
-                    self.process = subprocess.Popen(
-                        [ps_cmd, '-NoLogo', '-NoProfile', '-Command', '-'],
-                        stdin=subprocess.PIPE,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=0,
-                        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
-                    )
-                    break
-                except FileNotFoundError:
-                    continue
-            else:
-                # Fallback to cmd.exe
-                self.process = subprocess.Popen(
-                    ['cmd.exe'],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=0,
-                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
-                )
-            
-            # Start output reader
-            self.output_thread = threading.Thread(
-                target=self._read_windows_output, 
-                daemon=True
-            )
-            self.output_thread.start()
-            
-            logging.info(f"[SSH-WebTerm] Windows terminal session {self.session_id} initialized")
-            
-        except Exception as e:
-            logging.error(f"[SSH-WebTerm] Failed to initialize Windows terminal: {e}")
-            self.active = False
-    
-    def _init_unix_terminal(self):
-        """Initialize Unix/Linux terminal using pty"""
-        try:
-            # Create pseudo-terminal
-            self.master_fd, slave_fd = pty.openpty()
-            
-            # Fork process
-            self.pid = os.fork()
-            if self.pid == 0:
-                # Child process - become shell
-                os.setsid()
-                os.dup2(slave_fd, 0)  # stdin
-                os.dup2(slave_fd, 1)  # stdout
-                os.dup2(slave_fd, 2)  # stderr
-                os.close(self.master_fd)
-                os.close(slave_fd)
-                
-                # Set environment variables
-                os.environ['TERM'] = 'xterm-256color'
-                os.environ['SHELL'] = '/bin/bash'
-                os.environ['PS1'] = r'\u@\h:\w$ '
-                
-                # Execute shell
-                os.execv('/bin/bash', ['/bin/bash', '-l'])
-            else:
-                # Parent process
-                os.close(slave_fd)
-                
-                # Make master non-blocking
-                fcntl.fcntl(self.master_fd, fcntl.F_SETFL, os.O_NONBLOCK)
-                
-                # Start output reader
-                self.output_thread = threading.Thread(
-                    target=self._read_unix_output, 
-                    daemon=True
-                )
-                self.output_thread.start()
-                
-                logging.info(f"[SSH-WebTerm] Unix terminal session {self.session_id} initialized")
-                
-        except Exception as e:
-            logging.error(f"[SSH-WebTerm] Failed to initialize Unix terminal: {e}")
-            self.active = False
-    
-    def _read_windows_output(self):
-        """Read output from Windows subprocess"""
-        while self.active and self.process.poll() is None:
-            try:
-                line = self.process.stdout.readline()
-                if line:
-                    self.output_buffer.put(line.rstrip('\r\n'))
-                    self.last_activity = time.time()
-                else:
-                    time.sleep(0.05)  # Prevent busy waiting
-            except Exception as e:
-                logging.error(f"[SSH-WebTerm] Windows output read error: {e}")
-                break
-        
-        self.active = False
-    
-    def _read_unix_output(self):
-        """Read output from Unix pty"""
-        while self.active:
-            try:
-                ready, _, _ = select.select([self.master_fd], [], [], 0.1)
-                if ready:
-                    data = os.read(self.master_fd, 4096)
-                    if data:
-                        output = data.decode('utf-8', errors='ignore')
-                        self.output_buffer.put(output)
-                        self.last_activity = time.time()
-                    else:
-                        break
-            except (OSError, IOError) as e:
-                logging.error(f"[SSH-WebTerm] Unix output read error: {e}")
-                break
-        
-        self.active = False
-    
-    def write_input(self, data):
-        """Send input to terminal"""
-        if not self.active:
-            return False
-        
-        try:
-            # Add to command history if it's a complete command
-            if data.endswith('\n') and data.strip():
-                cmd = data.strip()
-                if cmd not in self.command_history:
-                    self.command_history.append(cmd)
-                    # Keep only last 50 commands
-                    if len(self.command_history) > 50:
-                        self.command_history.pop(0)
-            
-            if self.platform == "windows":
-                self.process.stdin.write(data)
-                self.process.stdin.flush()
-            else:
-                os.write(self.master_fd, data.encode('utf-8'))
-            
-            self.last_activity = time.time()
-            return True
-            
-        except (OSError, IOError, BrokenPipeError) as e:
-            logging.error(f"[SSH-WebTerm] Input write error: {e}")
-            self.active = False
-            return False
-    
-    def read_output(self):
-        """Get accumulated output"""
-        output = ""
-        try:
-            while not self.output_buffer.empty():
-                output += self.output_buffer.get_nowait()
-        except queue.Empty:
-            pass
-        
-        return output
-    
-    def resize(self, rows, cols):
-        """Resize terminal window"""
-        if not self.active or self.platform == "windows":
-            return False
-        
-        try:
-            winsize = struct.pack('HHHH', rows, cols, 0, 0)
-            fcntl.ioctl(self.master_fd, termios.TIOCSWINSZ, winsize)
-            return True
-        except (OSError, IOError):
-            return False
-    
-    def close(self):
-        """Close terminal session"""
-        self.active = False
-        
-        try:
-            if self.platform == "windows":
-                self.process.terminate()
-                try:
-                    self.process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    self.process.kill()
-            else:
-                os.close(self.master_fd)
-                try:
-                    os.kill(self.pid, signal.SIGTERM)
-                    os.waitpid(self.pid, 0)
-                except (OSError, ProcessLookupError):
-                    pass
-        except Exception as e:
-            logging.error(f"[SSH-WebTerm] Error closing session: {e}")
-    
-    def is_alive(self):
-        """Check if session is still active"""
-        if not self.active:
-            return False
-        
-        # Check for timeout (30 minutes)
-        if time.time() - self.last_activity > 1800:
-            self.close()
-            return False
-        
-        if self.platform == "windows":
-            return self.process.poll() is None
-        else:
-            try:
-                os.kill(self.pid, 0)
-                return True
-            except ProcessLookupError:
-                return False
+SSH_UNIT = 'ssh.service'
+SSH_PORT_HEX = '0016'       # port 22 as it appears in /proc/net/tcp
+TCP_ESTABLISHED = '01'
+PROC_NET_TCP = ('/proc/net/tcp', '/proc/net/tcp6')
+SSHD_PID_FILE = '/run/sshd.pid'  # written by the Debian/Raspbian sshd
 
+# `ss -tn` row: State Recv-Q Send-Q Local:Port Peer:Port, local port 22 only
+SS_ESTABLISHED_RE = re.compile(rb'^ESTAB\s+\d+\s+\d+\s+(\S+:22)\s+(\S+)', re.M)
 
-class WebTerminalManager:
-    """Manages multiple web terminal sessions"""
-    
-    def __init__(self):
-        self.sessions = {}
-        self.session_counter = 0
-        self.cleanup_thread = threading.Thread(target=self._cleanup_sessions, daemon=True)
-        self.cleanup_thread.start()
-    
-    def create_session(self):
-        """Create new terminal session"""
-        session_id = f"term_{int(time.time())}_{self.session_counter}"
-        self.session_counter += 1
-        
-        session = WebTerminalSession(session_id)
-        if session.active:
-            self.sessions[session_id] = session
-            logging.info(f"[SSH-WebTerm] Created session: {session_id}")
-            return session_id
-        else:
-            logging.error(f"[SSH-WebTerm] Failed to create session: {session_id}")
-            return None
-    
-    def get_session(self, session_id):
-        """Get existing session"""
-        return self.sessions.get(session_id)
-    
-    def close_session(self, session_id):
-        """Close and remove session"""
-        session = self.sessions.get(session_id)
-        if session:
-            session.close()
-            del self.sessions[session_id]
-            logging.info(f"[SSH-WebTerm] Closed session: {session_id}")
-    
-    def _cleanup_sessions(self):
-        """Background cleanup of dead sessions"""
-        while True:
-            try:
-                time.sleep(60)  # Check every minute
-                dead_sessions = []
-                
-                for session_id, session in self.sessions.items():
-                    if not session.is_alive():
-                        dead_sessions.append(session_id)
-                
-                for session_id in dead_sessions:
-                    self.close_session(session_id)
-                    
-            except Exception as e:
-                logging.error(f"[SSH-WebTerm] Session cleanup error: {e}")
+# api/terminal/<session id>/<op>
+TERMINAL_OP_RE = re.compile(r'^api/terminal/([^/]+)/(input|output|stream|resize|close|history)$')
+# Session ids as minted by WebTerminalManager.create_session
+TERMINAL_ID_RE = re.compile(r'^term_\d+_\d+$')
 
+_PTY_READ_SIZE = 65536
+# Reads per session per wakeup before the reader moves on to other ptys
+_DRAIN_READS = 16
+# struct winsize for TIOCSWINSZ: rows, cols, xpixel, ypixel
+_WINSZ = struct.Struct('HHHH')
+_OUTPUT_BUFFER_SIZE = 1 << 20
+# Coalesce bursts: hold output until this much is buffered or this much time passes
+_FLUSH_BYTES = 128 * 1024
+_FLUSH_WINDOW = 0.030
+# Upper bound on how long an output request may wait for new data
+_LONG_POLL_TIMEOUT = 25.0
+# Largest request body we'll parse; terminal input and resize are tiny
+_MAX_REQUEST_BODY = 16 * 1024
 
-class SSH(plugins.Plugin):
-    __author__ = 'Pwnagotchi Community'
-    __version__ = '2.0.0'
-    __license__ = 'GPL3'
-    __description__ = 'Advanced SSH Web Terminal for Pwnagotchi Torch'
+# Inlined into the dashboard so the first paint needs no stylesheet round trip
+DASHBOARD_CRITICAL_CSS = """
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body { 
+    font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace; 
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: #333;
+    min-height: 100vh;
+}
+.container { 
+    max-width: 1200px; 
+    margin: 0 auto; 
+    padding: 20px;
+}
+.header {
+    background: rgba(255,255,255,0.95);
+    padding: 20px;
+    border-radius: 15px;
+    margin-bottom: 20px;
+    box-shadow: 0 8px 32px rgba(0,0,0,0.1);
+    backdrop-filter: blur(10px);
+}
+.header h1 {
+    font-size: 2.5em;
+    color: #2c3e50;
+    margin-bottom: 10px;
+}
+.header p {
+    color: #7f8c8d;
+    font-size: 1.1em;
+}
+.card {
+    background: rgba(255,255,255,0.95);
+    border-radius: 15px;
+    padding: 25px;
+    margin-bottom: 20px;
+    box-shadow: 0 8px 32px rgba(0,0,0,0.1);
+    backdrop-filter: blur(10px);
+}
+.status-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+    gap: 20px;
+    margin-bottom: 30px;
+}
+.status-card {
+    background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+    color: white;
+    padding: 20px;
+    border-radius: 12px;
+    text-align: center;
+}
+.status-card.active {
+    background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
+}
+.status-card.warning {
+    background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
+}
+.status-value {
+    font-size: 2.5em;
+    font-weight: bold;
+    margin-bottom: 5px;
+}
+.status-label {
+    font-size: 1.1em;
+    opacity: 0.9;
+}
+.btn {
+    display: inline-block;
+    padding: 12px 24px;
+    border: none;
+    border-radius: 8px;
+    font-size: 1em;
+    font-weight: bold;
+    text-decoration: none;
+    cursor: pointer;
+    transition: all 0.3s ease;
+    margin: 5px;
+}
+.btn[hidden] { display: none; }
+.btn-primary {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+}
+.btn-success {
+    background: linear-gradient(135deg, #56ab2f 0%, #a8e6cf 100%);
+    color: white;
+}
+.btn-danger {
+    background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);
+    color: white;
+}
+.nav {
+    margin: 20px 0;
+}
+.nav a {
+    color: #667eea;
+    text-decoration: none;
+    margin-right: 20px;
+    font-weight: bold;
+}
+"""
 
-    def __init__(self):
-        self.options = {
-            'enabled': True,
-            'display_on_screen': True,
-            'ssh_x_coord': 160,
-            'ssh_y_coord': 66,
-            'auto_start_ssh': True,
-            'enable_web_terminal': True,
-            'terminal_theme': 'dark',
-            'max_sessions': 5
-        }
-        
-        self.ssh_status = False
-        self.active_connections = 0
-        self.ready = False
-        self.terminal_manager = WebTerminalManager()
+# Below-the-fold and hover styles, loaded without blocking render
+DASHBOARD_CSS = """
+.btn:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 5px 15px rgba(0,0,0,0.2);
+}
+.terminal-preview {
+    background: #1e1e1e;
+    color: #00ff00;
+    padding: 20px;
+    border-radius: 10px;
+    font-family: 'Courier New', monospace;
+    margin: 20px 0;
+}
+.feature-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+    gap: 20px;
+}
+.feature-card {
+    background: rgba(255,255,255,0.8);
+    padding: 20px;
+    border-radius: 10px;
+    border-left: 4px solid #667eea;
+}
+table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 15px 0;
+}
+th, td {
+    padding: 12px;
+    text-align: left;
+    border-bottom: 1px solid #ddd;
+}
+th {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+}
+.footer {
+    text-align: center;
+    margin-top: 40px;
+    opacity: 0.7;
+}
+"""
 
-    def on_loaded(self):
-        """Plugin initialization"""
-        logging.info("[SSH-WebTerm] SSH Web Terminal plugin loaded")
-        
-        # Check SSH service status
-        self.ssh_status = self._check_ssh_status()
-        logging.info(f"[SSH-WebTerm] SSH service status: {'active' if self.ssh_status else 'inactive'}")
-        
-        # Auto-start SSH if configured
-        if self.options.get('auto_start_ssh', True) and not self.ssh_status:
-            logging.info("[SSH-WebTerm] Auto-starting SSH service...")
-            self._start_ssh_service()
-        
-        self.ready = True
+TERMINAL_CSS = """
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body { 
+    font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace; 
+    background: #1a1a1a;
+    color: #fff;
+    height: 100vh;
+    overflow: hidden;
+}
+.header {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    padding: 10px 20px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.3);
+}
+.header h1 {
+    font-size: 1.5em;
+    margin: 0;
+}
+.controls {
+    display: flex;
+    gap: 10px;
+}
+.btn {
+    padding: 8px 16px;
+    border: none;
+    border-radius: 6px;
+    font-size: 0.9em;
+    font-weight: bold;
+    cursor: pointer;
+    transition: all 0.3s ease;
+}
+.btn-primary { background: #007bff; color: white; }
+.btn-success { background: #28a745; color: white; }
+.btn-danger { background: #dc3545; color: white; }
+.btn-secondary { background: #6c757d; color: white; }
+.btn:hover { opacity: 0.8; transform: translateY(-1px); }
+.btn:disabled { opacity: 0.5; cursor: not-allowed; }
 
-    def on_ui_setup(self, ui):
-        """Setup UI display elements"""
-        if not self.options.get('display_on_screen', True):
-            return
-            
-        with ui._lock:
-            ui.add_element(
-                'ssh_status',
-                LabeledValue(
-                    color=BLACK,
-                    label='SSH',
-                    value='Starting...',
-                    position=(
-                        int(self.options.get('ssh_x_coord', 160)),
-                        int(self.options.get('ssh_y_coord', 66))
-                    ),
-                    label_font=fonts.Small,
-                    text_font=fonts.Small
-                )
-            )
+.status-bar {
+    background: #2a2a2a;
+    padding: 8px 20px;
+    font-size: 0.9em;
+    border-bottom: 1px solid #444;
+}
+.status-connected { color: #28a745; }
+.status-disconnected { color: #dc3545; }
+.status-connecting { color: #ffc107; }
 
-    def on_ui_update(self, ui):
-        """Update UI display"""
-        if not self.options.get('display_on_screen', True):
-            return
-            
-        current_status = self._check_ssh_status()
-        self.active_connections = len(self._get_ssh_connections())
-        
-        if current_status:
-            if self.active_connections > 0:
-                status_text = f"ON[{self.active_connections}]"
-            else:
-                status_text = "ON"
-        else:
-            status_text = "OFF"
-        
-        ui.set('ssh_status', status_text)
+.terminal-container {
+    height: calc(100vh - 120px);
+    background: #0d1117;
+    position: relative;
+}
+.terminal {
+    width: 100%;
+    height: 100%;
+    margin: 0;
+    box-sizing: border-box;
+    background: #0d1117;
+    color: #58a6ff;
+    font-family: 'SF Mono', 'Monaco', 'Inconsolata', 'Roboto Mono', monospace;
+    font-size: 14px;
+    line-height: 1.4;
+    padding: 20px;
+    border: none;
+    outline: none;
+    overflow-y: auto;
+    white-space: pre-wrap;
+    word-wrap: break-word;
+}
+.terminal:focus {
+    background: #0d1117;
+}
+.terminal:empty::before {
+    content: attr(data-placeholder);
+    color: #6e7681;
+}
 
-    def on_unload(self, ui):
-        """Plugin cleanup"""
-        if self.options.get('display_on_screen', True):
-            with ui._lock:
-                ui.remove_element('ssh_status')
-        
-        # Close all terminal sessions
-        for session_id in list(self.terminal_manager.sessions.keys()):
-            self.terminal_manager.close_session(session_id)
-        
-        logging.info("[SSH-WebTerm] SSH Web Terminal plugin unloaded")
+.input-line {
+    background: #161b22;
+    border-top: 1px solid #30363d;
+    padding: 10px 20px;
+    display: flex;
+    align-items: center;
+}
+.prompt {
+    color: #7c3aed;
+    margin-right: 8px;
+    font-weight: bold;
+}
+.command-input {
+    flex: 1;
+    background: transparent;
+    border: none;
+    color: #f0f6fc;
+    font-family: inherit;
+    font-size: 14px;
+    outline: none;
+}
 
-    def on_webhook(self, path, request):
-        """Handle web requests"""
-        if not self.ready:
-            abort(503)  # Service Unavailable
+.nav {
+    margin-right: 20px;
+}
+.nav a {
+    color: rgba(255,255,255,0.8);
+    text-decoration: none;
+    margin-left: 15px;
+    font-size: 0.9em;
+}
+.nav a:hover {
+    color: white;
+}
 
-        logging.info(f"[SSH-WebTerm] Webhook: {request.method} {path}")
-        
-        try:
-            # Main dashboard
-            if path == "/" or path == "" or path is None:
-                return self._render_dashboard()
-            
-            # Web terminal page
-            elif path == "terminal":
-                return self._render_terminal()
-            
-            # API endpoints
-            elif path == "api/ssh/status":
-                return jsonify({
-                    'ssh_active': self._check_ssh_status(),
-                    'connections': len(self._get_ssh_connections()),
-                    'uptime': self._get_ssh_uptime()
-                })
-            
-            elif path == "api/ssh/start":
-                success = self._start_ssh_service()
-                return jsonify({'success': success})
-            
-            elif path == "api/ssh/stop":
-                success = self._stop_ssh_service()
-                return jsonify({'success': success})
-            
-            # Terminal API
-            elif path == "api/terminal/create":
-                session_id = self.terminal_manager.create_session()
-                return jsonify({
-                    'success': session_id is not None,
-                    'session_id': session_id,
-                    'message': 'Terminal session created' if session_id else 'Failed to create session'
-                })
-            
-            elif path.startswith("api/terminal/") and "/input" in path:
-                session_id = path.split("/")[2]
-                data = request.get_json() or {}
-                input_data = data.get('input', '')
-                
-                session = self.terminal_manager.get_session(session_id)
-                if session:
-                    success = session.write_input(input_data)
-                    return jsonify({'success': success})
-                else:
-                    return jsonify({'success': False, 'error': 'Session not found'})
-            
-            elif path.startswith("api/terminal/") and "/output" in path:
-                session_id = path.split("/")[2]
-                session = self.terminal_manager.get_session(session_id)
-                
-                if session:
-                    output = session.read_output()
-                    return jsonify({'output': output, 'active': session.is_alive()})
-                else:
-                    return jsonify({'output': '', 'active': False, 'error': 'Session not found'})
-            
-            elif path.startswith("api/terminal/") and "/resize" in path:
-                session_id = path.split("/")[2]
-                data = request.get_json() or {}
-                rows = data.get('rows', 24)
-                cols = data.get('cols', 80)
-                
-                session = self.terminal_manager.get_session(session_id)
-                if session:
-                    success = session.resize(rows, cols)
-                    return jsonify({'success': success})
-                else:
-                    return jsonify({'success': False, 'error': 'Session not found'})
-            
-            elif path.startswith("api/terminal/") and "/close" in path:
-                session_id = path.split("/")[2]
-                self.terminal_manager.close_session(session_id)
-                return jsonify({'success': True})
-            
-            elif path.startswith("api/terminal/") and "/history" in path:
-                session_id = path.split("/")[2]
-                session = self.terminal_manager.get_session(session_id)
-                
-                if session:
-                    return jsonify({
-                        'history': session.command_history,
-                        'success': True
-                    })
-                else:
-                    return jsonify({'history': [], 'success': False})
+/* Terminal animations */
+.cursor {
+    animation: blink 1s infinite;
+}
+@keyframes blink {
+    0%, 50% { opacity: 1; }
+    51%, 100% { opacity: 0; }
+}
 
-        except Exception as e:
-            logging.error(f"[SSH-WebTerm] Webhook error: {e}")
-            return jsonify({'error': str(e)}), 500
-        
-        # 404 for unhandled paths
-        abort(404)
+/* Responsive design */
+@media (max-width: 768px) {
+    .header h1 { font-size: 1.2em; }
+    .controls { gap: 5px; }
+    .btn { padding: 6px 12px; font-size: 0.8em; }
+    .terminal { font-size: 12px; padding: 15px; }
+}
+"""
 
-    def _check_ssh_status(self):
-        """Check SSH service status"""
-        try:
-            result = subprocess.run(
-                ['systemctl', 'is-active', 'ssh'], 
-                capture_output=True, 
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0 and result.stdout.strip() == 'active'
-        except Exception:
-            return False
+DASHBOARD_JS = """
+function toggleSSH(action) {
+    fetch(`/plugins/ssh/api/ssh/${action}`, {method: 'POST'})
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                refreshStatus();
+            } else {
+                alert(`Failed to ${action} SSH service`);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Operation failed');
+        });
+}
 
-    def _start_ssh_service(self):
-        """Start SSH service"""
-        try:
-            result = subprocess.run(
-                ['sudo', 'systemctl', 'start', 'ssh'], 
-                capture_output=True, 
-                text=True,
-                timeout=10
-            )
-            success = result.returncode == 0
-            if success:
-                logging.info("[SSH-WebTerm] SSH service started")
-                self.ssh_status = True
-            return success
-        except Exception as e:
-            logging.error(f"[SSH-WebTerm] Failed to start SSH: {e}")
-            return False
+// Update status indicators in place instead of reloading the page
+function refreshStatus() {
+    fetch('/plugins/ssh/api/ssh/status')
+        .then(response => response.json())
+        .then(data => {
+            const active = Boolean(data.ssh_active);
+            const card = document.getElementById('ssh-card');
+            card.classList.toggle('active', active);
+            card.classList.toggle('warning', !active);
+            document.getElementById('ssh-state').textContent = active ? 'ON' : 'OFF';
+            document.getElementById('conn-count').textContent = data.connections;
+            document.getElementById('ssh-start').hidden = active;
+            document.getElementById('ssh-stop').hidden = !active;
+        })
+        .catch(error => console.error('Status update failed:', error));
+}
 
-    def _stop_ssh_service(self):
-        """Stop SSH service"""
-        try:
-            result = subprocess.run(
-                ['sudo', 'systemctl', 'stop', 'ssh'], 
-                capture_output=True, 
-                text=True,
-                timeout=10
-            )
-            success = result.returncode == 0
-            if success:
-                logging.info("[SSH-WebTerm] SSH service stopped")
-                self.ssh_status = False
-            return success
-        except Exception as e:
-            logging.error(f"[SSH-WebTerm] Failed to stop SSH: {e}")
-            return False
+// Auto-refresh status every 5 seconds
+setInterval(refreshStatus, 5000);
+"""
 
-    def _get_ssh_connections(self):
-        """Get active SSH connections"""
-        connections = []
-        try:
-            result = subprocess.run(
-                ['ss', '-tuln'], 
-                capture_output=True, 
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if ':22' in line and 'LISTEN' not in line and 'ESTAB' in line:
-                        parts = line.split()
-                        if len(parts) >= 5:
-                            connections.append({
-                                'local': parts[3],
-                                'remote': parts[4],
-                                'time': datetime.now().strftime('%H:%M:%S')
-                            })
-        except Exception:
-            pass
-        
-        return connections
+TERMINAL_JS = """
+class WebTerminal {
+    constructor() {
+        this.sessionId = null;
+        this.connected = false;
+        this.polling = null;
+        this.pollDelay = 100;
+        this.abortCtrl = null;
+        this.eventSource = null;
+        this.pendingOutput = '';
+        this.outputLength = 0;
+        this.outputFrame = null;
+        this.pendingInput = '';
+        this.inputTimer = null;
+        this.resizeTimer = null;
+        this.lastSize = '';
+        this.commandHistory = [];
+        this.historyIndex = -1;
 
-    def _get_ssh_uptime(self):
-        """Get SSH service uptime"""
-        try:
-            result = subprocess.run(
-                ['systemctl', 'show', 'ssh', '--property=ActiveEnterTimestamp'], 
-                capture_output=True, 
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                return result.stdout.strip().split('=')[1]
-        except Exception:
-            pass
-        return "Unknown"
+        this.terminal = document.getElementById('terminal');
+        this.commandInput = document.getElementById('commandInput');
+        this.promptEl = document.getElementById('prompt');
+        this.promptIsDollar = true;
+        this.status = document.getElementById('status');
+        this.sessionInfo = document.getElementById('sessionInfo');
 
-    def _render_dashboard(self):
-        """Render main dashboard"""
-        ssh_active = self._check_ssh_status()
-        connections = self._get_ssh_connections()
-        active_terminals = len(self.terminal_manager.sessions)
-        
-        template = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>SSH Web Terminal - {{ pwnagotchi_name }}</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: #333;
-            min-height: 100vh;
-        }
-        .container { 
-            max-width: 1200px; 
-            margin: 0 auto; 
-            padding: 20px;
-        }
-        .header {
-            background: rgba(255,255,255,0.95);
-            padding: 20px;
-            border-radius: 15px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-            backdrop-filter: blur(10px);
-        }
-        .header h1 {
-            font-size: 2.5em;
-            color: #2c3e50;
-            margin-bottom: 10px;
-        }
-        .header p {
-            color: #7f8c8d;
-            font-size: 1.1em;
-        }
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 15px;
-            padding: 25px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-            backdrop-filter: blur(10px);
-        }
-        .status-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
+        this.connectBtn = document.getElementById('connectBtn');
+        this.disconnectBtn = document.getElementById('disconnectBtn');
+        this.clearBtn = document.getElementById('clearBtn');
+        this.fullscreenBtn = document.getElementById('fullscreenBtn');
+
+        this.initializeEventListeners();
+    }
+
+    initializeEventListeners() {
+        this.connectBtn.addEventListener('click', () => this.connect());
+        this.disconnectBtn.addEventListener('click', () => this.disconnect());
+        this.clearBtn.addEventListener('click', () => this.clearTerminal());
+        this.fullscreenBtn.addEventListener('click', () => this.toggleFullscreen());
+
+        this.commandInput.addEventListener('keydown', (e) => this.handleKeyDown(e));
+        this.commandInput.addEventListener('keyup', (e) => this.handleKeyUp(e));
+
+        // Auto-resize handling: trailing debounce so the pty is resized once
+        // the element settles, not on every pixel of a drag
+        const onResize = () => {
+            clearTimeout(this.resizeTimer);
+            this.resizeTimer = setTimeout(() => this.handleResize(), 150);
+        };
+        if (window.ResizeObserver) {
+            new ResizeObserver(onResize).observe(this.terminal);
+        } else {
+            window.addEventListener('resize', onResize);
         }
-        .status-card {
-            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 12px;
-            text-align: center;
+
+        // Focus management
+        this.terminal.addEventListener('click', () => this.commandInput.focus());
+
+        // Close the session when the tab goes away, releasing the server
+        // threads held by our pending requests. Batched input is dropped with
+        // it: the shell is about to be killed, so there is nothing to deliver to
+        window.addEventListener('pagehide', () => this.disconnect());
+
+        // Auto-connect on load
+        setTimeout(() => this.connect(), 1000);
+    }
+
+    async connect() {
+        try {
+            this.updateStatus('Connecting...', 'connecting');
+            this.connectBtn.disabled = true;
+
+            const response = await fetch('/plugins/ssh/api/terminal/create', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' }
+            });
+
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+
+            const data = await response.json();
+
+            if (data.success && data.session_id) {
+                this.sessionId = data.session_id;
+                // Lets disconnect() cancel every request still in flight for this session
+                this.abortCtrl = new AbortController();
+                this.connected = true;
+                this.updateStatus('Connected', 'connected');
+                this.sessionInfo.textContent = `Session: ${this.sessionId}`;
+                this.enableControls();
+                this.startStreaming();
+                this.lastSize = '';
+                this.handleResize();
+                this.clearOutput();
+                this.appendOutput(
+                    `Welcome to Pwnagotchi Web Terminal\\n` +
+                    `Session ID: ${this.sessionId}\\n` +
+                    `Type 'help' for available commands\\n\\n`
+                );
+                this.commandInput.focus();
+
+                // Load command history
+                this.loadCommandHistory();
+            } else {
+                throw new Error(data.message || 'Failed to create terminal session');
+            }
+        } catch (error) {
+            console.error('Connection error:', error);
+            this.updateStatus(`Error: ${error.message}`, 'disconnected');
+            this.connectBtn.disabled = false;
         }
-        .status-card.active {
-            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
+    }
+
+    async disconnect() {
+        const sessionId = this.sessionId;
+        if (this.abortCtrl) {
+            this.abortCtrl.abort();
+            this.abortCtrl = null;
         }
-        .status-card.warning {
-            background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
+
+        clearTimeout(this.inputTimer);
+        this.inputTimer = null;
+        this.pendingInput = '';
+        this.connected = false;
+        this.sessionId = null;
+        // Show the session's last output now rather than in a later frame
+        this.flushOutput();
+        this.updateStatus('Disconnected', 'disconnected');
+        this.sessionInfo.textContent = '';
+        this.disableControls();
+        this.stopStreaming();
+
+        if (sessionId) {
+            try {
+                // keepalive lets the close outlive the page on pagehide
+                await fetch(`/plugins/ssh/api/terminal/${sessionId}/close`, {
+                    method: 'POST',
+                    keepalive: true
+                });
+            } catch (error) {
+                console.error('Error closing session:', error);
+            }
         }
-        .status-value {
-            font-size: 2.5em;
-            font-weight: bold;
-            margin-bottom: 5px;
+    }
+
+    clearTerminal() {
+        this.clearOutput();
+        this.commandInput.focus();
+    }
+
+    clearOutput() {
+        this.terminal.textContent = '';
+        this.outputLength = 0;
+    }
+
+    toggleFullscreen() {
+        if (!document.fullscreenElement) {
+            document.documentElement.requestFullscreen();
+            this.fullscreenBtn.textContent = '🔍 Exit Fullscreen';
+        } else {
+            document.exitFullscreen();
+            this.fullscreenBtn.textContent = '🔍 Fullscreen';
         }
-        .status-label {
-            font-size: 1.1em;
-            opacity: 0.9;
+    }
+
+    async handleKeyDown(e) {
+        if (!this.connected || !this.sessionId) return;
+
+        switch (e.key) {
+            case 'Enter':
+                e.preventDefault();
+                await this.executeCommand();
+                break;
+            case 'ArrowUp':
+                e.preventDefault();
+                this.navigateHistory(-1);
+                break;
+            case 'ArrowDown':
+                e.preventDefault();
+                this.navigateHistory(1);
+                break;
+            case 'Tab':
+                e.preventDefault();
+                // TODO: Implement tab completion
+                break;
+            case 'c':
+                if (e.ctrlKey) {
+                    e.preventDefault();
+                    await this.sendInput('\\x03'); // Ctrl+C
+                }
+                break;
         }
-        .btn {
-            display: inline-block;
-            padding: 12px 24px;
-            border: none;
-            border-radius: 8px;
-            font-size: 1em;
-            font-weight: bold;
-            text-decoration: none;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            margin: 5px;
+    }
+
+    handleKeyUp(e) {
+        // Update prompt based on input
+        this.setPrompt(this.commandInput.value.length === 0);
+    }
+
+    setPrompt(empty) {
+        // Only touch the DOM when the input flips between empty and non-empty
+        if (empty === this.promptIsDollar) return;
+        this.promptEl.textContent = empty ? '$' : '>';
+        this.promptIsDollar = empty;
+    }
+
+    async executeCommand() {
+        const command = this.commandInput.value.trim();
+        if (!command) return;
+
+        // Add to history
+        if (command !== this.commandHistory[this.commandHistory.length - 1]) {
+            this.commandHistory.push(command);
+            if (this.commandHistory.length > 100) {
+                this.commandHistory.shift();
+            }
+            this.saveCommandHistory();
         }
-        .btn-primary {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
+        this.historyIndex = this.commandHistory.length;
+
+        // Display command in terminal
+        this.appendOutput(`$ ${command}\\n`);
+
+        // Send to backend
+        await this.sendInput(command + '\\n');
+
+        // Clear input
+        this.commandInput.value = '';
+        this.setPrompt(true);
+    }
+
+    async sendInput(input) {
+        if (!this.connected || !this.sessionId) return;
+
+        // Coalesce bursts into one request; large pastes go out right away
+        this.pendingInput += input;
+        if (this.pendingInput.length > 1024) {
+            await this.flushInput();
+        } else if (!this.inputTimer) {
+            this.inputTimer = setTimeout(() => this.flushInput(), 8);
         }
-        .btn-success {
-            background: linear-gradient(135deg, #56ab2f 0%, #a8e6cf 100%);
-            color: white;
+    }
+
+    async flushInput() {
+        clearTimeout(this.inputTimer);
+        this.inputTimer = null;
+        const input = this.pendingInput;
+        this.pendingInput = '';
+        if (!input || !this.connected || !this.sessionId) return;
+
+        try {
+            await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/input`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ input: input }),
+                signal: this.abortCtrl.signal
+            });
+        } catch (error) {
+            if (error.name === 'AbortError') return;
+            console.error('Error sending input:', error);
         }
-        .btn-danger {
-            background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);
-            color: white;
+    }
+
+    async pollOutput() {
+        if (!this.connected || !this.sessionId) return;
+
+        try {
+            const response = await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/output?wait=25`, {
+                signal: this.abortCtrl.signal
+            });
+            if (!response.ok) {
+                // Server is struggling; back off instead of re-polling at once
+                await new Promise(resolve => setTimeout(resolve, this.pollDelay));
+                this.pollDelay = Math.min(this.pollDelay * 2, 2000);
+                return;
+            }
+            this.pollDelay = 100;
+            // 204 means the wait ran out with nothing to show
+            if (response.status === 204) return;
+            this.handleOutput(await response.json());
+        } catch (error) {
+            // Cancelled by disconnect(); nothing left to tear down
+            if (error.name === 'AbortError') return;
+            console.error('Polling error:', error);
+            this.disconnect();
         }
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(0,0,0,0.2);
+    }
+
+    handleOutput(data) {
+        if (data.output) {
+            this.appendOutput(data.output);
         }
-        .terminal-preview {
-            background: #1e1e1e;
-            color: #00ff00;
-            padding: 20px;
-            border-radius: 10px;
-            font-family: 'Courier New', monospace;
-            margin: 20px 0;
+
+        if (!data.active) {
+            this.disconnect();
         }
-        .feature-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
+    }
+
+    appendOutput(text) {
+        // Batch chunks so the terminal reflows at most once per frame
+        this.pendingOutput += text;
+        if (this.outputFrame === null) {
+            this.outputFrame = requestAnimationFrame(() => this.flushOutput());
         }
-        .feature-card {
-            background: rgba(255,255,255,0.8);
-            padding: 20px;
-            border-radius: 10px;
-            border-left: 4px solid #667eea;
+    }
+
+    loadCommandHistory() {
+        // Kept in the browser so reconnecting doesn't cost a round trip
+        try {
+            this.commandHistory = JSON.parse(localStorage.getItem('sshHistory') || '[]');
+        } catch (error) {
+            console.error('Error loading history:', error);
+            this.commandHistory = [];
         }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 15px 0;
+        this.historyIndex = this.commandHistory.length;
+    }
+
+    saveCommandHistory() {
+        try {
+            localStorage.setItem('sshHistory', JSON.stringify(this.commandHistory));
+        } catch (error) {
+            console.error('Error saving history:', error);
         }
-        th, td {
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #ddd;
+    }
+
+    navigateHistory(direction) {
+        if (this.commandHistory.length === 0) return;
+
+        this.historyIndex += direction;
+
+        if (this.historyIndex < 0) {
+            this.historyIndex = 0;
+        } else if (this.historyIndex >= this.commandHistory.length) {
+            this.historyIndex = this.commandHistory.length;
+            this.commandInput.value = '';
+            return;
         }
-        th {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
+
+        this.commandInput.value = this.commandHistory[this.historyIndex] || '';
+    }
+
+    flushOutput() {
+        cancelAnimationFrame(this.outputFrame);
+        this.outputFrame = null;
+        if (!this.pendingOutput) return;
+        // One span per frame: appending costs O(new text), not O(scrollback)
+        const span = document.createElement('span');
+        span.textContent = this.pendingOutput;
+        this.pendingOutput = '';
+        this.terminal.appendChild(span);
+        this.outputLength += span.textContent.length;
+
+        // Bound scrollback, in characters and in nodes, by dropping whole
+        // chunks from the top
+        while ((this.outputLength > 262144 || this.terminal.childElementCount > 2000) &&
+               this.terminal.firstChild !== span) {
+            this.outputLength -= this.terminal.firstChild.textContent.length;
+            this.terminal.removeChild(this.terminal.firstChild);
         }
-        .nav {
-            margin: 20px 0;
+        this.terminal.scrollTop = this.terminal.scrollHeight;
+    }
+
+    startStreaming() {
+        // Server-Sent Events push output as it arrives; long-poll where unavailable
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
         }
-        .nav a {
-            color: #667eea;
-            text-decoration: none;
-            margin-right: 20px;
-            font-weight: bold;
+
+        const source = new EventSource(`/plugins/ssh/api/terminal/${this.sessionId}/stream`);
+        source.onmessage = (e) => this.appendOutput(JSON.parse(e.data));
+        source.addEventListener('close', () => this.disconnect());
+        source.onerror = () => {
+            // The browser retries dropped streams itself; only a refused one ends up CLOSED
+            if (source.readyState === EventSource.CLOSED) {
+                this.stopStreaming();
+                this.startPolling();
+            }
+        };
+        this.eventSource = source;
+    }
+
+    stopStreaming() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
         }
-        .footer {
-            text-align: center;
-            margin-top: 40px;
-            opacity: 0.7;
+        this.stopPolling();
+    }
+
+    async startPolling() {
+        // Long-poll: the server holds each request until output arrives
+        const sessionId = this.sessionId;
+        this.polling = sessionId;
+        while (this.polling === sessionId && this.connected) {
+            await this.pollOutput();
         }
-    </style>
-    <script>
-        function toggleSSH(action) {
-            fetch(`/plugins/ssh/api/ssh/${action}`, {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        location.reload();
-                    } else {
-                        alert(`Failed to ${action} SSH service`);
-                    }
-                })
-                .catch(error => {
-                    console.error('Error:', error);
-                    alert('Operation failed');
-                });
+    }
+
+    stopPolling() {
+        this.polling = null;
+    }
+
+    updateStatus(text, type) {
+        this.status.textContent = `● ${text}`;
+        this.status.className = `status-${type}`;
+    }
+
+    enableControls() {
+        this.connectBtn.disabled = true;
+        this.disconnectBtn.disabled = false;
+        this.clearBtn.disabled = false;
+        this.commandInput.disabled = false;
+    }
+
+    disableControls() {
+        this.connectBtn.disabled = false;
+        this.disconnectBtn.disabled = true;
+        this.clearBtn.disabled = true;
+        this.commandInput.disabled = true;
+    }
+
+    async handleResize() {
+        if (!this.connected || !this.sessionId) return;
+
+        const rows = Math.floor(this.terminal.clientHeight / 20);
+        const cols = Math.floor(this.terminal.clientWidth / 8);
+        const size = `${rows}x${cols}`;
+        if (size === this.lastSize) return;
+        this.lastSize = size;
+
+        try {
+            await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/resize`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ rows, cols }),
+                signal: this.abortCtrl.signal
+            });
+        } catch (error) {
+            if (error.name === 'AbortError') return;
+            console.error('Resize error:', error);
         }
-        
-        // Auto-refresh status every 30 seconds
-        setInterval(() => {
-            fetch('/plugins/ssh/api/ssh/status')
-                .then(response => response.json())
-                .then(data => {
-                    // Update status indicators without full page reload
-                    console.log('Status updated:', data);
-                })
-                .catch(error => console.error('Status update failed:', error));
-        }, 30000);
-    </script>
+    }
+}
+
+// Initialize terminal when page loads
+window.addEventListener('load', () => {
+    window.webTerminal = new WebTerminal();
+});
+
+// Handle fullscreen changes
+document.addEventListener('fullscreenchange', () => {
+    const btn = document.getElementById('fullscreenBtn');
+    if (document.fullscreenElement) {
+        btn.textContent = '🔍 Exit Fullscreen';
+    } else {
+        btn.textContent = '🔍 Fullscreen';
+    }
+});
+"""
+
+# Served from /plugins/ssh/static/<name> with long-lived caching
+STATIC_ASSETS = {
+    'dashboard.css': ('text/css; charset=utf-8', DASHBOARD_CSS),
+    'terminal.css': ('text/css; charset=utf-8', TERMINAL_CSS),
+    'dashboard.js': ('application/javascript; charset=utf-8', DASHBOARD_JS),
+    'terminal.js': ('application/javascript; charset=utf-8', TERMINAL_JS),
+}
+
+
+def _minify(name, text):
+    """Minify an asset when the optional minifier for its type is installed"""
+    if name.endswith('.js') and jsmin is not None:
+        return jsmin(text)
+    if name.endswith('.css') and cssmin is not None:
+        return cssmin(text)
+    return text
+
+
+# Minified, encoded, compressed and fingerprinted once at import:
+# name -> (body, gzipped body, content_type, md5)
+_STATIC = {}
+for _name, (_content_type, _text) in STATIC_ASSETS.items():
+    _body = _minify(_name, _text).encode('utf-8')
+    _STATIC[_name] = (_body, gzip.compress(_body, mtime=0), _content_type,
+                      hashlib.md5(_body).hexdigest())
+
+
+def _static_url(name):
+    """Versioned URL for a static asset, so it can be cached as immutable"""
+    return f'/plugins/ssh/static/{name}?v={_STATIC[name][3][:12]}'
+
+
+DASHBOARD_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>SSH Web Terminal - {{ pwnagotchi_name }}</title>
+    <style>{{ dashboard_critical_css }}</style>
+    <link rel="preload" href="{{ static_url('dashboard.css') }}" as="style" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link rel="stylesheet" href="{{ static_url('dashboard.css') }}"></noscript>
+    <script src="{{ static_url('dashboard.js') }}" defer></script>
 </head>
 <body>
     <div class="container">
@@ -791,12 +928,12 @@ class SSH(plugins.Plugin):
         </div>
 
         <div class="status-grid">
-            <div class="status-card {{ 'active' if ssh_active else 'warning' }}">
-                <div class="status-value">{{ 'ON' if ssh_active else 'OFF' }}</div>
+            <div id="ssh-card" class="status-card {{ 'active' if ssh_active else 'warning' }}">
+                <div id="ssh-state" class="status-value">{{ 'ON' if ssh_active else 'OFF' }}</div>
                 <div class="status-label">SSH Service</div>
             </div>
             <div class="status-card active">
-                <div class="status-value">{{ connection_count }}</div>
+                <div id="conn-count" class="status-value">{{ connection_count }}</div>
                 <div class="status-label">SSH Connections</div>
             </div>
             <div class="status-card">
@@ -808,11 +945,8 @@ class SSH(plugins.Plugin):
         <div class="card">
             <h2>🔧 Service Control</h2>
             <div style="margin: 20px 0;">
-                {% if ssh_active %}
-                    <button class="btn btn-danger" onclick="toggleSSH('stop')">🛑 Stop SSH</button>
-                {% else %}
-                    <button class="btn btn-success" onclick="toggleSSH('start')">▶️ Start SSH</button>
-                {% endif %}
+                <button id="ssh-stop" class="btn btn-danger" onclick="toggleSSH('stop')" {{ '' if ssh_active else 'hidden' }}>🛑 Stop SSH</button>
+                <button id="ssh-start" class="btn btn-success" onclick="toggleSSH('start')" {{ 'hidden' if ssh_active else '' }}>▶️ Start SSH</button>
                 <a href="/plugins/ssh/terminal" class="btn btn-primary">💻 Open Web Terminal</a>
             </div>
         </div>
@@ -879,157 +1013,16 @@ class SSH(plugins.Plugin):
     </div>
 </body>
 </html>
-        """
-        
-        return render_template_string(
-            template,
-            pwnagotchi_name=pwnagotchi.name(),
-            ssh_active=ssh_active,
-            connections=connections,
-            connection_count=len(connections),
-            terminal_count=active_terminals
-        )
+"""
 
-    def _render_terminal(self):
-        """Render terminal interface"""
-        template = """
+TERMINAL_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Web Terminal - {{ pwnagotchi_name }}</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace; 
-            background: #1a1a1a;
-            color: #fff;
-            height: 100vh;
-            overflow: hidden;
-        }
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 10px 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.3);
-        }
-        .header h1 {
-            font-size: 1.5em;
-            margin: 0;
-        }
-        .controls {
-            display: flex;
-            gap: 10px;
-        }
-        .btn {
-            padding: 8px 16px;
-            border: none;
-            border-radius: 6px;
-            font-size: 0.9em;
-            font-weight: bold;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-        .btn-primary { background: #007bff; color: white; }
-        .btn-success { background: #28a745; color: white; }
-        .btn-danger { background: #dc3545; color: white; }
-        .btn-secondary { background: #6c757d; color: white; }
-        .btn:hover { opacity: 0.8; transform: translateY(-1px); }
-        .btn:disabled { opacity: 0.5; cursor: not-allowed; }
-        
-        .status-bar {
-            background: #2a2a2a;
-            padding: 8px 20px;
-            font-size: 0.9em;
-            border-bottom: 1px solid #444;
-        }
-        .status-connected { color: #28a745; }
-        .status-disconnected { color: #dc3545; }
-        .status-connecting { color: #ffc107; }
-        
-        .terminal-container {
-            height: calc(100vh - 120px);
-            background: #0d1117;
-            position: relative;
-        }
-        .terminal {
-            width: 100%;
-            height: 100%;
-            background: #0d1117;
-            color: #58a6ff;
-            font-family: 'SF Mono', 'Monaco', 'Inconsolata', 'Roboto Mono', monospace;
-            font-size: 14px;
-            line-height: 1.4;
-            padding: 20px;
-            border: none;
-            outline: none;
-            resize: none;
-            overflow-y: auto;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-        }
-        .terminal:focus {
-            background: #0d1117;
-        }
-        .terminal::placeholder {
-            color: #6e7681;
-        }
-        
-        .input-line {
-            background: #161b22;
-            border-top: 1px solid #30363d;
-            padding: 10px 20px;
-            display: flex;
-            align-items: center;
-        }
-        .prompt {
-            color: #7c3aed;
-            margin-right: 8px;
-            font-weight: bold;
-        }
-        .command-input {
-            flex: 1;
-            background: transparent;
-            border: none;
-            color: #f0f6fc;
-            font-family: inherit;
-            font-size: 14px;
-            outline: none;
-        }
-        
-        .nav {
-            margin-right: 20px;
-        }
-        .nav a {
-            color: rgba(255,255,255,0.8);
-            text-decoration: none;
-            margin-left: 15px;
-            font-size: 0.9em;
-        }
-        .nav a:hover {
-            color: white;
-        }
-        
-        /* Terminal animations */
-        .cursor {
-            animation: blink 1s infinite;
-        }
-        @keyframes blink {
-            0%, 50% { opacity: 1; }
-            51%, 100% { opacity: 0; }
-        }
-        
-        /* Responsive design */
-        @media (max-width: 768px) {
-            .header h1 { font-size: 1.2em; }
-            .controls { gap: 5px; }
-            .btn { padding: 6px 12px; font-size: 0.8em; }
-            .terminal { font-size: 12px; padding: 15px; }
-        }
-    </style>
+    <link rel="stylesheet" href="{{ static_url('terminal.css') }}">
 </head>
 <body>
     <div class="header">
@@ -1053,7 +1046,7 @@ class SSH(plugins.Plugin):
     </div>
     
     <div class="terminal-container">
-        <textarea id="terminal" class="terminal" placeholder="Click Connect to start terminal session..." readonly></textarea>
+        <pre id="terminal" class="terminal" tabindex="0" data-placeholder="Click Connect to start terminal session..."></pre>
     </div>
     
     <div class="input-line">
@@ -1061,316 +1054,1234 @@ class SSH(plugins.Plugin):
         <input type="text" id="commandInput" class="command-input" placeholder="Type commands here..." disabled>
     </div>
 
-    <script>
-        class WebTerminal {
-            constructor() {
-                this.sessionId = null;
-                this.connected = false;
-                this.pollInterval = null;
-                this.commandHistory = [];
-                this.historyIndex = -1;
-                
-                this.terminal = document.getElementById('terminal');
-                this.commandInput = document.getElementById('commandInput');
-                this.status = document.getElementById('status');
-                this.sessionInfo = document.getElementById('sessionInfo');
-                
-                this.connectBtn = document.getElementById('connectBtn');
-                this.disconnectBtn = document.getElementById('disconnectBtn');
-                this.clearBtn = document.getElementById('clearBtn');
-                this.fullscreenBtn = document.getElementById('fullscreenBtn');
-                
-                this.initializeEventListeners();
-            }
-            
-            initializeEventListeners() {
-                this.connectBtn.addEventListener('click', () => this.connect());
-                this.disconnectBtn.addEventListener('click', () => this.disconnect());
-                this.clearBtn.addEventListener('click', () => this.clearTerminal());
-                this.fullscreenBtn.addEventListener('click', () => this.toggleFullscreen());
-                
-                this.commandInput.addEventListener('keydown', (e) => this.handleKeyDown(e));
-                this.commandInput.addEventListener('keyup', (e) => this.handleKeyUp(e));
-                
-                // Auto-resize handling
-                window.addEventListener('resize', () => this.handleResize());
-                
-                // Focus management
-                this.terminal.addEventListener('click', () => this.commandInput.focus());
-                
-                // Auto-connect on load
-                setTimeout(() => this.connect(), 1000);
-            }
-            
-            async connect() {
-                try {
-                    this.updateStatus('Connecting...', 'connecting');
-                    this.connectBtn.disabled = true;
-                    
-                    const response = await fetch('/plugins/ssh/api/terminal/create', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' }
-                    });
-                    
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-                    }
-                    
-                    const data = await response.json();
-                    
-                    if (data.success && data.session_id) {
-                        this.sessionId = data.session_id;
-                        this.connected = true;
-                        this.updateStatus('Connected', 'connected');
-                        this.sessionInfo.textContent = `Session: ${this.sessionId}`;
-                        this.enableControls();
-                        this.startPolling();
-                        this.terminal.value = `Welcome to Pwnagotchi Web Terminal\\n`;
-                        this.terminal.value += `Session ID: ${this.sessionId}\\n`;
-                        this.terminal.value += `Type 'help' for available commands\\n\\n`;
-                        this.commandInput.focus();
-                        
-                        // Load command history
-                        this.loadCommandHistory();
-                    } else {
-                        throw new Error(data.message || 'Failed to create terminal session');
-                    }
-                } catch (error) {
-                    console.error('Connection error:', error);
-                    this.updateStatus(`Error: ${error.message}`, 'disconnected');
-                    this.connectBtn.disabled = false;
-                }
-            }
-            
-            async disconnect() {
-                if (this.sessionId) {
-                    try {
-                        await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/close`, {
-                            method: 'POST'
-                        });
-                    } catch (error) {
-                        console.error('Error closing session:', error);
-                    }
-                }
-                
-                this.connected = false;
-                this.sessionId = null;
-                this.updateStatus('Disconnected', 'disconnected');
-                this.sessionInfo.textContent = '';
-                this.disableControls();
-                this.stopPolling();
-            }
+    <script src="{{ static_url('terminal.js') }}"></script>
+</body>
+</html>
+"""
+
+# Parsed and compiled once at import, shared by every render
+_JINJA_ENV = jinja2.Environment(autoescape=True)
+_JINJA_ENV.globals['static_url'] = _static_url
+_JINJA_ENV.globals['dashboard_critical_css'] = Markup(_minify('critical.css', DASHBOARD_CRITICAL_CSS))
+_DASHBOARD_TMPL = _JINJA_ENV.from_string(DASHBOARD_TEMPLATE)
+_TERMINAL_TMPL = _JINJA_ENV.from_string(TERMINAL_TEMPLATE)
+
+
+def _cached_response(body, content_type, etag, cache_control, gzipped=None):
+    """Respond with a fixed body, or 304 when the client already holds ``etag``.
+
+    ``gzipped`` is a precompressed copy of ``body``, sent to clients that accept it.
+    """
+    headers = {
+        'Content-Type': content_type,
+        'Cache-Control': cache_control,
+    }
+    if gzipped is not None:
+        headers['Vary'] = 'Accept-Encoding'
+        # Index rather than 'in' so the quality counts: gzip;q=0 is a refusal
+        if request.accept_encodings['gzip'] > 0:
+            # A different representation needs its own validator
+            body, etag = gzipped, f'{etag}-gz'
+            headers['Content-Encoding'] = 'gzip'
+    headers['ETag'] = f'"{etag}"'
+    if request.if_none_match.contains(etag):
+        return '', 304, headers
+    return body, 200, headers
+
+
+def _request_json():
+    """Decode the JSON request body, reading at most _MAX_REQUEST_BODY bytes.
+
+    Chunked uploads carry no Content-Length for on_webhook to check up front,
+    so the read itself is bounded.
+    """
+    body = request.stream.read(_MAX_REQUEST_BODY + 1)
+    if len(body) > _MAX_REQUEST_BODY:
+        raise RequestEntityTooLarge()
+    return json.loads(body) if body else {}
+
+
+def _json_response(payload, status=200):
+    """Build a JSON response directly, using orjson when it is installed"""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return Response(body, status=status, mimetype='application/json')
+
+
+class OutputRingBuffer:
+    """Fixed-size byte ring between the pty reader and the output endpoint.
+
+    When the browser falls behind, the oldest bytes are overwritten so the
+    producer never blocks.
+    """
+    
+    def __init__(self, capacity=_OUTPUT_BUFFER_SIZE):
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._capacity = capacity
+        self._head = 0  # total bytes consumed
+        self._tail = 0  # total bytes produced
+        self.first_write = 0.0  # when the buffer last went from empty to non-empty
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return self._tail - self._head
+    
+    def write(self, data):
+        """Append bytes, dropping the oldest ones on overflow"""
+        cap = self._capacity
+        data = memoryview(data)[-cap:]
+        n = len(data)
+        with self._lock:
+            if self._tail == self._head:
+                self.first_write = time.monotonic()
+            start = self._tail % cap
+            first = min(n, cap - start)
+            self._view[start:start + first] = data[:first]
+            if first < n:
+                self._view[:n - first] = data[first:]
+            self._tail += n
+            if self._tail - self._head > cap:
+                self._head = self._tail - cap
+    
+    def drain(self):
+        """Return and consume everything buffered"""
+        with self._lock:
+            n = self._tail - self._head
+            if not n:
+                return b''
+            start = self._head % self._capacity
+            end = start + n
+            if end <= self._capacity:
+                data = self._view[start:end].tobytes()
+            else:
+                data = self._view[start:].tobytes() + self._view[:end - self._capacity].tobytes()
+            self._head = self._tail
+            return data
+
+
+class WebTerminalSession:
+    """Enhanced web terminal session with better error handling and features"""
+    
+    def __init__(self, session_id, reader=None):
+        self.session_id = session_id
+        self.active = True
+        self._closed = False
+        self._reader = reader
+        self.exit_status = None  # shell return code once it has been reaped
+        self.created_at = time.time()
+        self.last_activity = time.time()
+        self.output_buffer = OutputRingBuffer()
+        self.output_ready = threading.Event()
+        # Keeps a multi-byte character split across two drains intact
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._decode_lock = threading.Lock()
+        # Held by the reader across a drain, so close() can't free the fd mid-read
+        self._fd_lock = threading.Lock()
+        # Last 50 distinct commands; the set makes the duplicate check O(1)
+        self.command_history = collections.deque(maxlen=50)
+        self._history_set = set()
+        
+        # Platform-specific initialization
+        import platform
+        self.platform = platform.system().lower()
+        
+        if self.platform == "windows":
+            self._init_windows_terminal()
+        else:
+            self._init_unix_terminal()
+    
+    def _init_windows_terminal(self):
+        """Initialize Windows terminal using PowerShell"""
+        try:
+            # Try PowerShell Core first, then Windows PowerShell
+            for ps_cmd in ['pwsh.exe', 'powershell.exe']:
+                try:
+                    self.process = subprocess.Popen(
+                        [ps_cmd, '-NoLogo', '-NoProfile', '-Command', '-'],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        text=True,
+                        bufsize=-1,
+                        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
+                    )
+                    break
+                except FileNotFoundError:
+                    continue
+            else:
+                # Fallback to cmd.exe
+                self.process = subprocess.Popen(
+                    ['cmd.exe'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    bufsize=-1,
+                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
+                )
             
-            clearTerminal() {
-                this.terminal.value = '';
-                this.commandInput.focus();
-            }
+            # Start output reader
+            self.output_thread = threading.Thread(
+                target=self._read_windows_output, 
+                daemon=True
+            )
+            self.output_thread.start()
             
-            toggleFullscreen() {
-                if (!document.fullscreenElement) {
-                    document.documentElement.requestFullscreen();
-                    this.fullscreenBtn.textContent = '🔍 Exit Fullscreen';
-                } else {
-                    document.exitFullscreen();
-                    this.fullscreenBtn.textContent = '🔍 Fullscreen';
-                }
-            }
+            logging.info(f"[SSH-WebTerm] Windows terminal session {self.session_id} initialized")
             
-            async handleKeyDown(e) {
-                if (!this.connected || !this.sessionId) return;
-                
-                switch (e.key) {
-                    case 'Enter':
-                        e.preventDefault();
-                        await this.executeCommand();
-                        break;
-                    case 'ArrowUp':
-                        e.preventDefault();
-                        this.navigateHistory(-1);
-                        break;
-                    case 'ArrowDown':
-                        e.preventDefault();
-                        this.navigateHistory(1);
-                        break;
-                    case 'Tab':
-                        e.preventDefault();
-                        // TODO: Implement tab completion
-                        break;
-                    case 'c':
-                        if (e.ctrlKey) {
-                            e.preventDefault();
-                            await this.sendInput('\\x03'); // Ctrl+C
-                        }
-                        break;
-                }
-            }
+        except Exception as e:
+            logging.error(f"[SSH-WebTerm] Failed to initialize Windows terminal: {e}")
+            self.active = False
+    
+    def _init_unix_terminal(self):
+        """Initialize Unix/Linux terminal using pty"""
+        self.process = None
+        self.master_fd = None
+        try:
+            if self._reader is None:
+                raise RuntimeError("no pty reader available")
             
-            handleKeyUp(e) {
-                // Update prompt based on input
-                const input = this.commandInput.value;
-                if (input.length > 0) {
-                    document.getElementById('prompt').textContent = '>';
-                } else {
-                    document.getElementById('prompt').textContent = '$';
-                }
-            }
+            # Create pseudo-terminal
+            self.master_fd, slave_fd = pty.openpty()
             
-            async executeCommand() {
-                const command = this.commandInput.value.trim();
-                if (!command) return;
-                
-                // Add to history
-                if (command !== this.commandHistory[this.commandHistory.length - 1]) {
-                    this.commandHistory.push(command);
-                    if (this.commandHistory.length > 100) {
-                        this.commandHistory.shift();
+            # Spawn the shell in its own session on the pty; Popen can use
+            # vfork/posix_spawn here instead of copying the whole plugin process
+            try:
+                self.process = subprocess.Popen(
+                    ['/bin/bash', '-l'],
+                    stdin=slave_fd,
+                    stdout=slave_fd,
+                    stderr=slave_fd,
+                    start_new_session=True,
+                    env={
+                        **os.environ,
+                        'TERM': 'xterm-256color',
+                        'SHELL': '/bin/bash',
+                        'PS1': r'\u@\h:\w$ ',
                     }
-                }
-                this.historyIndex = this.commandHistory.length;
-                
-                // Display command in terminal
-                this.terminal.value += `$ ${command}\\n`;
-                
-                // Send to backend
-                await this.sendInput(command + '\\n');
-                
-                // Clear input
-                this.commandInput.value = '';
-                document.getElementById('prompt').textContent = '$';
-            }
+                )
+            finally:
+                os.close(slave_fd)
             
-            async sendInput(input) {
-                if (!this.connected || !this.sessionId) return;
-                
-                try {
-                    await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/input`, {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ input: input })
-                    });
-                } catch (error) {
-                    console.error('Error sending input:', error);
-                }
-            }
+            # Make master non-blocking
+            fcntl.fcntl(self.master_fd, fcntl.F_SETFL, os.O_NONBLOCK)
             
-            async pollOutput() {
-                if (!this.connected || !this.sessionId) return;
-                
-                try {
-                    const response = await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/output`);
-                    const data = await response.json();
-                    
-                    if (data.output) {
-                        this.terminal.value += data.output;
-                        this.terminal.scrollTop = this.terminal.scrollHeight;
-                    }
-                    
-                    if (!data.active) {
-                        this.disconnect();
-                    }
-                } catch (error) {
-                    console.error('Polling error:', error);
-                    this.disconnect();
-                }
-            }
+            # Output is read by the manager's shared reader thread
+            self._reader.register(self.master_fd, self)
             
-            async loadCommandHistory() {
-                if (!this.sessionId) return;
+            logging.info(f"[SSH-WebTerm] Unix terminal session {self.session_id} initialized")
                 
-                try {
-                    const response = await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/history`);
-                    const data = await response.json();
+        except Exception as e:
+            logging.error(f"[SSH-WebTerm] Failed to initialize Unix terminal: {e}")
+            self.active = False
+            # Don't leave a shell or the master fd behind for a session nobody can reach
+            self._closed = True
+            if self.master_fd is not None:
+                self._reader.unregister(self.master_fd)
+                os.close(self.master_fd)
+            if self.process is not None and self.process.poll() is None:
+                self.process.kill()
+                self.process.wait()
+    
+    def _read_windows_output(self):
+        """Read output from Windows subprocess"""
+        while self.active:
+            try:
+                # Blocks until a line arrives; an empty string means EOF
+                line = self.process.stdout.readline()
+                if not line:
+                    break
+                self.output_buffer.write(line.rstrip('\r\n').encode('utf-8'))
+                self.output_ready.set()
+                self.last_activity = time.time()
+            except Exception as e:
+                logging.error(f"[SSH-WebTerm] Windows output read error: {e}")
+                break
+        
+        self.active = False
+        self.output_ready.set()
+    
+    def _drain(self, scratch):
+        """Read pty output via ``scratch`` until EAGAIN, EOF or the read budget runs out.
+
+        Returns True if the budget ran out with data possibly still pending.
+        """
+        got = False
+        try:
+            with self._fd_lock:
+                # close() may have won the lock; the fd could already be reused
+                if self._closed:
+                    return False
+                for _ in range(_DRAIN_READS):
+                    try:
+                        n = os.readv(self.master_fd, [scratch])
+                    except BlockingIOError:
+                        return False
+                    except OSError as e:
+                        # EIO is how Linux reports that the shell side has gone away
+                        if e.errno != errno.EIO:
+                            logging.error(f"[SSH-WebTerm] Unix output read error: {e}")
+                        n = 0
                     
-                    if (data.success) {
-                        this.commandHistory = data.history || [];
-                        this.historyIndex = this.commandHistory.length;
-                    }
-                } catch (error) {
-                    console.error('Error loading history:', error);
-                }
-            }
-            
-            navigateHistory(direction) {
-                if (this.commandHistory.length === 0) return;
-                
-                this.historyIndex += direction;
-                
-                if (this.historyIndex < 0) {
-                    this.historyIndex = 0;
-                } else if (this.historyIndex >= this.commandHistory.length) {
-                    this.historyIndex = this.commandHistory.length;
-                    this.commandInput.value = '';
-                    return;
-                }
-                
-                this.commandInput.value = this.commandHistory[this.historyIndex] || '';
-            }
-            
-            startPolling() {
-                this.pollInterval = setInterval(() => this.pollOutput(), 200);
-            }
-            
-            stopPolling() {
-                if (this.pollInterval) {
-                    clearInterval(this.pollInterval);
-                    this.pollInterval = null;
-                }
-            }
-            
-            updateStatus(text, type) {
-                this.status.textContent = `● ${text}`;
-                this.status.className = `status-${type}`;
-            }
+                    if not n:
+                        self.active = False
+                        self._reap()  # don't leave a zombie until the session is closed
+                        return False
+                    
+                    self.output_buffer.write(scratch[:n])
+                    got = True
+                return True
+        finally:
+            if got:
+                self.last_activity = time.time()
+            if got or not self.active:
+                self.output_ready.set()
+    
+    def _unwatch(self):
+        """Stop the shared reader from polling this session's pty"""
+        self._reader.unregister(self.master_fd)
+    
+    def write_input(self, data):
+        """Send input to terminal"""
+        if not self.active:
+            return False
+        
+        try:
+            # Add to command history if it's a complete command
+            if data.endswith('\n') and data.strip():
+                cmd = data.strip()
+                if cmd not in self._history_set:
+                    if len(self.command_history) == self.command_history.maxlen:
+                        self._history_set.discard(self.command_history[0])
+                    self.command_history.append(cmd)
+                    self._history_set.add(cmd)
             
-            enableControls() {
-                this.connectBtn.disabled = true;
-                this.disconnectBtn.disabled = false;
-                this.clearBtn.disabled = false;
-                this.commandInput.disabled = false;
-            }
+            if self.platform == "windows":
+                self.process.stdin.write(data)
+                self.process.stdin.flush()
+            else:
+                os.write(self.master_fd, data.encode('utf-8'))
             
-            disableControls() {
-                this.connectBtn.disabled = false;
-                this.disconnectBtn.disabled = true;
-                this.clearBtn.disabled = true;
-                this.commandInput.disabled = true;
-            }
+            self.last_activity = time.time()
+            return True
             
-            async handleResize() {
-                if (!this.connected || !this.sessionId) return;
-                
-                const rows = Math.floor(this.terminal.clientHeight / 20);
-                const cols = Math.floor(this.terminal.clientWidth / 8);
-                
-                try {
-                    await fetch(`/plugins/ssh/api/terminal/${this.sessionId}/resize`, {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ rows, cols })
-                    });
-                } catch (error) {
-                    console.error('Resize error:', error);
-                }
-            }
-        }
+        except (OSError, IOError, BrokenPipeError) as e:
+            logging.error(f"[SSH-WebTerm] Input write error: {e}")
+            self.active = False
+            return False
+    
+    def read_output(self, wait=0):
+        """Get accumulated output, letting a burst settle before answering.
+
+        With ``wait`` set, block up to that many seconds for output to arrive
+        instead of returning an empty response straight away.
+        """
+        deadline = time.monotonic() + wait
+        while wait and self.active and not len(self.output_buffer):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Clear before re-checking so a write in between can't be missed
+            self.output_ready.clear()
+            if not len(self.output_buffer) and self.active:
+                self.output_ready.wait(remaining)
         
-        // Initialize terminal when page loads
-        window.addEventListener('load', () => {
-            window.webTerminal = new WebTerminal();
-        });
+        pending = len(self.output_buffer)
+        if pending and pending < _FLUSH_BYTES:
+            remaining = _FLUSH_WINDOW - (time.monotonic() - self.output_buffer.first_write)
+            if remaining > 0:
+                time.sleep(remaining)
+        with self._decode_lock:
+            return self._decoder.decode(self.output_buffer.drain())
+    
+    def resize(self, rows, cols):
+        """Resize terminal window"""
+        if not self.active or self.platform == "windows":
+            return False
         
-        // Handle fullscreen changes
-        document.addEventListener('fullscreenchange', () => {
-            const btn = document.getElementById('fullscreenBtn');
-            if (document.fullscreenElement) {
-                btn.textContent = '🔍 Exit Fullscreen';
-            } else {
-                btn.textContent = '🔍 Fullscreen';
-            }
-        });
-    </script>
-</body>
-</html>
-        """
+        try:
+            fcntl.ioctl(self.master_fd, termios.TIOCSWINSZ, _WINSZ.pack(rows, cols, 0, 0))
+            return True
+        except (OSError, IOError):
+            return False
+    
+    def close(self):
+        """Close terminal session"""
+        self.active = False
+        self.output_ready.set()  # release any waiting output request
+        if self._closed:
+            return
+        self._closed = True
         
-        return render_template_string(template, pwnagotchi_name=pwnagotchi.name())
\ No newline at end of file
+        try:
+            if self.platform != "windows":
+                self._unwatch()
+                # Wait out a drain already in progress on the reader thread
+                with self._fd_lock:
+                    os.close(self.master_fd)
+            if self.process.poll() is None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+        except Exception as e:
+            logging.error(f"[SSH-WebTerm] Error closing session: {e}")
+    
+    def is_alive(self):
+        """Check if session is still active"""
+        if not self.active:
+            if self.platform != "windows":
+                self._reap()
+            return False
+        
+        # Check for timeout (30 minutes)
+        if time.time() - self.last_activity > 1800:
+            self.close()
+            return False
+        
+        if self.platform == "windows":
+            return self.process.poll() is None
+        else:
+            return not self._reap()
+    
+    def _reap(self):
+        """Collect the shell's exit status; True once it has exited and been reaped"""
+        if self.exit_status is None and self.process is not None:
+            self.exit_status = self.process.poll()
+        return self.exit_status is not None
+
+
+class PtyReader:
+    """Single thread that drains every unix pty.
+
+    Uses edge-triggered epoll on Linux and falls back to a level-triggered
+    ``selectors`` poller on other Unixes.
+    """
+    
+    def __init__(self):
+        if hasattr(select, 'epoll'):
+            self._epoll = select.epoll()
+            self._selector = None
+        else:
+            self._epoll = None
+            self._selector = selectors.DefaultSelector()
+        self._sessions = {}  # master fd -> WebTerminalSession
+        self._lock = threading.Lock()
+        # Reads land in one reusable buffer before being copied into a session's ring
+        self._scratch = memoryview(bytearray(_PTY_READ_SIZE))
+        # Self-pipe so close() can wake a poll() that has no timeout
+        self._closing = False
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._watch(self._wake_r, edge=False)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def register(self, fd, session):
+        """Start delivering output from ``fd`` to ``session``"""
+        with self._lock:
+            self._sessions[fd] = session
+        self._watch(fd)
+        if self._epoll is None:
+            # A blocked select()/poll() won't see the new fd until it wakes
+            os.write(self._wake_w, b'\0')
+    
+    def unregister(self, fd):
+        """Stop watching ``fd``; must happen before it is closed"""
+        with self._lock:
+            if self._sessions.pop(fd, None) is None:
+                return
+        try:
+            if self._epoll is not None:
+                self._epoll.unregister(fd)
+            else:
+                self._selector.unregister(fd)
+        except (OSError, KeyError, ValueError):
+            pass
+    
+    def close(self):
+        """Stop the reader thread and release the poller"""
+        if self._closing:
+            return
+        self._closing = True
+        os.write(self._wake_w, b'\0')
+        self.thread.join(timeout=5)
+    
+    def _watch(self, fd, edge=True):
+        """Add ``fd`` to the poller; ``edge`` only matters for epoll"""
+        if self._epoll is not None:
+            self._epoll.register(fd, select.EPOLLIN | (select.EPOLLET if edge else 0))
+        else:
+            self._selector.register(fd, selectors.EVENT_READ)
+    
+    def _poll(self, timeout):
+        """Readable fds, blocking when ``timeout`` is None"""
+        if self._epoll is not None:
+            return [fd for fd, _ in self._epoll.poll(-1 if timeout is None else timeout)]
+        return [key.fd for key, _ in self._selector.select(timeout)]
+    
+    def _run(self):
+        """Wait for readable ptys and drain each one to EAGAIN"""
+        backlog = []  # fds whose drain hit the read budget
+        while not self._closing:
+            try:
+                events = self._poll(0 if backlog else None)
+            except Exception as e:
+                logging.error(f"[SSH-WebTerm] Terminal reader error: {e}")
+                time.sleep(1)
+                continue
+            
+            # Edge-triggered: an fd is only reported again after new data, so
+            # anything left over from the last round is retried explicitly
+            ready = dict.fromkeys(backlog)
+            ready.update(dict.fromkeys(events))
+            backlog = []
+            for fd in ready:
+                if fd == self._wake_r:
+                    try:
+                        os.read(self._wake_r, 64)
+                    except BlockingIOError:
+                        pass
+                    continue
+                with self._lock:
+                    session = self._sessions.get(fd)
+                if session is None:
+                    continue
+                if session._drain(self._scratch):
+                    backlog.append(fd)
+                elif not session.active:
+                    self.unregister(fd)
+        
+        if self._epoll is not None:
+            self._epoll.close()
+        else:
+            self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+class WebTerminalManager:
+    """Manages multiple web terminal sessions"""
+    
+    def __init__(self):
+        self.sessions = {}
+        self.session_counter = 0
+        # Guards sessions and session_counter; webhooks and cleanup run on different threads
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self.cleanup_thread = threading.Thread(target=self._cleanup_sessions, daemon=True)
+        self.cleanup_thread.start()
+        
+        # One thread blocks on every unix pty instead of a poller per session
+        self._reader = PtyReader() if os.name == 'posix' else None
+    
+    def create_session(self):
+        """Create new terminal session"""
+        with self._lock:
+            session_id = f"term_{int(time.time())}_{self.session_counter}"
+            self.session_counter += 1
+        
+        # Spawning the shell happens outside the lock
+        session = WebTerminalSession(session_id, self._reader)
+        if session.active:
+            with self._lock:
+                self.sessions[session_id] = session
+            logging.info(f"[SSH-WebTerm] Created session: {session_id}")
+            return session_id
+        else:
+            logging.error(f"[SSH-WebTerm] Failed to create session: {session_id}")
+            return None
+    
+    def get_session(self, session_id):
+        """Get existing session"""
+        with self._lock:
+            return self.sessions.get(session_id)
+    
+    def close_session(self, session_id):
+        """Close and remove session"""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session:
+            session.close()
+            logging.info(f"[SSH-WebTerm] Closed session: {session_id}")
+    
+    def shutdown(self):
+        """Close every session and stop the pty reader"""
+        with self._lock:
+            session_ids = list(self.sessions)
+        for session_id in session_ids:
+            self.close_session(session_id)
+        self._stop.set()
+        if self._reader:
+            self._reader.close()
+    
+    def _cleanup_sessions(self):
+        """Background cleanup of dead sessions"""
+        # Check every minute until shutdown() wakes us
+        while not self._stop.wait(60):
+            try:
+                dead_sessions = []
+                now = time.time()
+                
+                with self._lock:
+                    snapshot = list(self.sessions.items())
+                
+                for session_id, session in snapshot:
+                    # Recently used sessions can't have timed out; a shell that
+                    # exited has already flagged itself inactive via EOF
+                    if session.active and now - session.last_activity < 1800:
+                        continue
+                    if not session.is_alive():
+                        dead_sessions.append(session_id)
+                
+                for session_id in dead_sessions:
+                    self.close_session(session_id)
+                    
+            except Exception as e:
+                logging.error(f"[SSH-WebTerm] Session cleanup error: {e}")
+
+
+class SSH(plugins.Plugin):
+    __author__ = 'Pwnagotchi Community'
+    __version__ = '2.0.0'
+    __license__ = 'GPL3'
+    __description__ = 'Advanced SSH Web Terminal for Pwnagotchi Torch'
+
+    def __init__(self):
+        self.options = {
+            'enabled': True,
+            'display_on_screen': True,
+            'ssh_x_coord': 160,
+            'ssh_y_coord': 66,
+            'auto_start_ssh': True,
+            'enable_web_terminal': True,
+            'terminal_theme': 'dark',
+            'max_sessions': 5,
+            'ui_refresh_interval': 2.0
+        }
+        
+        self.ssh_status = False
+        self.active_connections = 0
+        self.ready = False
+        self.terminal_manager = WebTerminalManager()
+        self._status_cache = {'ts': 0.0, 'status': False, 'conns': []}
+        self._refresh_lock = threading.Lock()
+        self._bus = None
+        self._systemd = None
+        self._name = None
+        self._terminal_page = None
+        self._last_status_text = None
+        self._last_ui_update = 0.0
+        self._uptime_cache = (None, None)  # (sshd pid, formatted start time)
+        self._systemctl = 'systemctl'
+        self._ss = 'ss'
+        
+        # Fixed webhook paths, looked up once per request
+        self._routes = {
+            ('GET', ''): self._render_dashboard,
+            ('GET', '/'): self._render_dashboard,
+            ('GET', 'terminal'): self._render_terminal,
+            ('GET', 'api/ssh/status'): self._api_ssh_status,
+            ('POST', 'api/ssh/start'): self._api_ssh_start,
+            ('POST', 'api/ssh/stop'): self._api_ssh_stop,
+            ('POST', 'api/terminal/create'): self._api_terminal_create,
+        }
+        self._terminal_ops = {
+            ('POST', 'input'): self._api_terminal_input,
+            ('GET', 'output'): self._api_terminal_output,
+            ('GET', 'stream'): self._api_terminal_stream,
+            ('POST', 'resize'): self._api_terminal_resize,
+            ('POST', 'close'): self._api_terminal_close,
+            ('GET', 'history'): self._api_terminal_history,
+        }
+        
+        for name in _STATIC:
+            self._routes[('GET', f'static/{name}')] = functools.partial(self._serve_static, name)
+        # HEAD is answered like GET for pages and assets only; the server drops
+        # the body. API reads have side effects (draining output), so no HEAD there
+        for method, path in list(self._routes):
+            if not path.startswith('api/'):
+                self._routes[('HEAD', path)] = self._routes[(method, path)]
+        # Known paths, to tell a wrong method (405) from a missing route (404)
+        self._route_paths = {path for _, path in self._routes}
+
+    def on_loaded(self):
+        """Plugin initialization"""
+        logging.info("[SSH-WebTerm] SSH Web Terminal plugin loaded")
+        
+        # The device name doesn't change while we're running
+        self._name = pwnagotchi.name()
+        # The terminal page depends on nothing else, so render it just once
+        self._terminal_page = _TERMINAL_TMPL.render(pwnagotchi_name=self._name).encode('utf-8')
+        self._terminal_etag = hashlib.md5(self._terminal_page).hexdigest()
+        self._terminal_gz = gzip.compress(self._terminal_page, mtime=0)
+        
+        # Resolve probe binaries once rather than searching PATH on every exec
+        self._systemctl = shutil.which('systemctl') or '/bin/systemctl'
+        self._ss = shutil.which('ss') or '/bin/ss'
+        
+        # Talk to systemd directly when python-dbus is available
+        self._connect_systemd()
+        
+        # Check SSH service status
+        # Also primes the status cache the display reads from
+        self.ssh_status, _ = self._cached_status()
+        logging.info(f"[SSH-WebTerm] SSH service status: {'active' if self.ssh_status else 'inactive'}")
+        
+        # Auto-start SSH if configured
+        if self.options.get('auto_start_ssh', True) and not self.ssh_status:
+            logging.info("[SSH-WebTerm] Auto-starting SSH service...")
+            self._start_ssh_service()
+        
+        self.ready = True
+
+    def on_ui_setup(self, ui):
+        """Setup UI display elements"""
+        if not self.options.get('display_on_screen', True):
+            return
+            
+        # The new element shows 'Starting...', so the next update must set it
+        self._last_status_text = None
+        self._last_ui_update = 0.0
+        with ui._lock:
+            ui.add_element(
+                'ssh_status',
+                LabeledValue(
+                    color=BLACK,
+                    label='SSH',
+                    value='Starting...',
+                    position=(
+                        int(self.options.get('ssh_x_coord', 160)),
+                        int(self.options.get('ssh_y_coord', 66))
+                    ),
+                    label_font=fonts.Small,
+                    text_font=fonts.Small
+                )
+            )
+
+    def on_ui_update(self, ui):
+        """Update UI display"""
+        if not self.options.get('display_on_screen', True):
+            return
+        
+        # The UI ticks far more often than the SSH state changes
+        now = time.monotonic()
+        if now - self._last_ui_update < float(self.options.get('ui_refresh_interval', 2.0)):
+            return
+        self._last_ui_update = now
+        
+        # Never probe on the UI thread; a stale cache is refreshed in the background
+        current_status, connections = self._cached_status(block=False)
+        self.active_connections = len(connections)
+        
+        if current_status:
+            if self.active_connections > 0:
+                status_text = f"ON[{self.active_connections}]"
+            else:
+                status_text = "ON"
+        else:
+            status_text = "OFF"
+        
+        # Skip the redraw when the label would not change
+        if status_text != self._last_status_text:
+            ui.set('ssh_status', status_text)
+            self._last_status_text = status_text
+
+    def on_unload(self, ui):
+        """Plugin cleanup"""
+        if self.options.get('display_on_screen', True):
+            with ui._lock:
+                ui.remove_element('ssh_status')
+        
+        # Close all terminal sessions and stop the reader thread
+        self.terminal_manager.shutdown()
+        
+        logging.info("[SSH-WebTerm] SSH Web Terminal plugin unloaded")
+
+    def on_webhook(self, path, request):
+        """Handle web requests"""
+        if not self.ready:
+            abort(503)  # Service Unavailable
+
+        logging.info(f"[SSH-WebTerm] Webhook: {request.method} {path}")
+        
+        # Refuse oversized bodies from the declared length, before anything reads them
+        if (request.content_length or 0) > _MAX_REQUEST_BODY:
+            return _json_response({'success': False, 'error': 'Request body too large'}, 413)
+        
+        path = path or ""
+        method = request.method
+        
+        try:
+            handler = self._routes.get((method, path))
+            if handler is not None:
+                return handler()
+            if path in self._route_paths:
+                return _json_response({'success': False, 'error': 'Method not allowed'}, 405)
+            
+            # Per-session terminal API
+            match = TERMINAL_OP_RE.match(path)
+            if match:
+                session_id, op = match.groups()
+                if not TERMINAL_ID_RE.match(session_id):
+                    return _json_response({'success': False, 'error': 'Invalid session id'}, 400)
+                handler = self._terminal_ops.get((method, op))
+                if handler is None:
+                    return _json_response({'success': False, 'error': 'Method not allowed'}, 405)
+                return handler(session_id)
+
+        except RequestEntityTooLarge:
+            return _json_response({'success': False, 'error': 'Request body too large'}, 413)
+        except Exception as e:
+            logging.error(f"[SSH-WebTerm] Webhook error: {e}")
+            return _json_response({'success': False, 'error': str(e)}, 500)
+        
+        # API clients parse JSON, pages get the host's HTML 404
+        if path.startswith('api/'):
+            return _json_response({'success': False, 'error': 'Not found'}, 404)
+        abort(404)
+
+    def _serve_static(self, name):
+        """Serve a static asset"""
+        body, gzipped, content_type, etag = _STATIC[name]
+        # Versioned URLs never change content, unversioned ones must revalidate
+        if request.args.get('v') == etag[:12]:
+            cache_control = 'public, max-age=31536000, immutable'
+        else:
+            cache_control = 'public, max-age=3600'
+        return _cached_response(body, content_type, etag, cache_control, gzipped)
+
+    def _api_ssh_status(self):
+        """Report SSH service status"""
+        ssh_active, connections = self._cached_status()
+        return _json_response({
+            'ssh_active': ssh_active,
+            'connections': len(connections),
+            'uptime': self._get_ssh_uptime()
+        })
+
+    def _api_ssh_start(self):
+        """Start SSH service"""
+        return _json_response({'success': self._start_ssh_service()})
+
+    def _api_ssh_stop(self):
+        """Stop SSH service"""
+        return _json_response({'success': self._stop_ssh_service()})
+
+    def _api_terminal_create(self):
+        """Create a new terminal session"""
+        session_id = self.terminal_manager.create_session()
+        return _json_response({
+            'success': session_id is not None,
+            'session_id': session_id,
+            'message': 'Terminal session created' if session_id else 'Failed to create session'
+        })
+
+    def _api_terminal_input(self, session_id):
+        """Send input to a terminal session"""
+        data = _request_json() or {}
+        session = self.terminal_manager.get_session(session_id)
+        if session:
+            return _json_response({'success': session.write_input(data.get('input', ''))})
+        return _json_response({'success': False, 'error': 'Session not found'})
+
+    def _api_terminal_output(self, session_id):
+        """Return pending terminal output; ?wait=N turns this into a long-poll"""
+        session = self.terminal_manager.get_session(session_id)
+        if not session:
+            return _json_response({'output': '', 'active': False, 'error': 'Session not found'})
+        
+        try:
+            wait = float(request.args.get('wait', 0))
+        except ValueError:
+            wait = 0.0
+        # nan slips through min/max, so anything non-finite is just a plain poll
+        wait = min(max(wait, 0.0), _LONG_POLL_TIMEOUT) if math.isfinite(wait) else 0.0
+        output = session.read_output(wait)
+        active = session.is_alive()
+        if wait and not output and active:
+            # Long-poll timed out quietly; the client just asks again
+            return Response(status=204)
+        return _json_response({'output': output, 'active': active})
+
+    def _api_terminal_stream(self, session_id):
+        """Push terminal output as Server-Sent Events until the session ends"""
+        session = self.terminal_manager.get_session(session_id)
+        if not session:
+            return _json_response({'success': False, 'error': 'Session not found'}, 404)
+        
+        def events():
+            while True:
+                output = session.read_output(_LONG_POLL_TIMEOUT)
+                if output:
+                    # A bare JSON string: SSE data can't carry raw CR/LF, and a
+                    # wrapper object would only repeat what the event type says
+                    yield f"data: {json.dumps(output, ensure_ascii=False)}\n\n"
+                if not session.is_alive():
+                    yield "event: close\ndata: \n\n"
+                    return
+                if not output:
+                    # Comment line: keeps proxies from timing out an idle stream
+                    yield ": keepalive\n\n"
+        
+        return Response(events(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+
+    def _api_terminal_resize(self, session_id):
+        """Resize a terminal session"""
+        data = _request_json() or {}
+        session = self.terminal_manager.get_session(session_id)
+        if session:
+            return _json_response({'success': session.resize(data.get('rows', 24), data.get('cols', 80))})
+        return _json_response({'success': False, 'error': 'Session not found'})
+
+    def _api_terminal_close(self, session_id):
+        """Close a terminal session"""
+        self.terminal_manager.close_session(session_id)
+        return _json_response({'success': True})
+
+    def _api_terminal_history(self, session_id):
+        """Return the command history of a terminal session"""
+        session = self.terminal_manager.get_session(session_id)
+        if session:
+            return _json_response({'history': list(session.command_history), 'success': True})
+        return _json_response({'history': [], 'success': False})
+
+    def _cached_status(self, ttl=3.0, block=True):
+        """Return (ssh_active, connections), re-probing at most once per ttl seconds.
+
+        With ``block=False`` a stale cache is returned as-is and refreshed on a
+        background thread, so the caller never waits on a probe.
+        """
+        cache = self._status_cache
+        now = time.monotonic()
+        if now - cache['ts'] < ttl:
+            return cache['status'], cache['conns']
+        
+        if not block:
+            # Single-flight: at most one background probe at a time
+            if self._refresh_lock.acquire(blocking=False):
+                threading.Thread(target=self._refresh_status, daemon=True).start()
+            return cache['status'], cache['conns']
+        
+        status, conns = self._probe_status()
+        self._status_cache = {'ts': now, 'status': status, 'conns': conns}
+        return status, conns
+
+    def _refresh_status(self):
+        """Background probe started by a non-blocking _cached_status()"""
+        try:
+            status, conns = self._probe_status()
+            self._status_cache = {'ts': time.monotonic(), 'status': status, 'conns': conns}
+        except Exception as e:
+            logging.error(f"[SSH-WebTerm] Status refresh error: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _probe_status(self):
+        """Query service state and connections, forking as little as possible"""
+        connections = self._read_proc_connections()
+        if connections is not None:
+            return self._check_ssh_status(), connections
+        
+        # No /proc: batch both probes into a single subprocess. close_fds=False
+        # (here and in the other probes) skips the child's fd sweep. The plugin's
+        # own fds are non-inheritable, but any inheritable fd held elsewhere in
+        # the pwnagotchi process is passed on to these short-lived, read-only
+        # commands; that is the accepted trade-off
+        try:
+            result = subprocess.run(
+                ['sh', '-c', '"$1" is-active ssh; echo ---; "$2" -tn', 'sh', self._systemctl, self._ss],
+                capture_output=True,
+                close_fds=False,
+                timeout=5
+            )
+            active_out, _, ss_out = result.stdout.partition(b'---\n')
+            return self._parse_active(active_out), self._parse_ss(ss_out)
+        except Exception:
+            return False, []
+
+    def _parse_active(self, raw):
+        """Parse raw `systemctl is-active` output"""
+        return raw.strip() == b'active'
+
+    def _parse_ss(self, raw):
+        """Parse established SSH connections out of raw `ss -tn` output"""
+        now = datetime.now().strftime('%H:%M:%S')
+        return [
+            {'local': m.group(1).decode(), 'remote': m.group(2).decode(), 'time': now}
+            for m in SS_ESTABLISHED_RE.finditer(raw)
+        ]
+
+    def _connect_systemd(self):
+        """Cache a systemd Manager proxy on the system bus, if reachable"""
+        if dbus is None:
+            return
+        try:
+            self._bus = dbus.SystemBus()
+            self._systemd = dbus.Interface(
+                self._bus.get_object('org.freedesktop.systemd1', '/org/freedesktop/systemd1'),
+                'org.freedesktop.systemd1.Manager'
+            )
+        except dbus.exceptions.DBusException as e:
+            logging.warning(f"[SSH-WebTerm] systemd D-Bus unavailable, using systemctl: {e}")
+            self._bus = None
+            self._systemd = None
+
+    def _systemd_job(self, method, timeout=10.0):
+        """Run a StartUnit/StopUnit job for SSH over D-Bus and wait for it to finish.
+
+        Returns the unit's ActiveState once the job is gone, or None when
+        D-Bus is unavailable and the caller should fall back to systemctl.
+        """
+        if self._systemd is None:
+            return None
+        try:
+            job = getattr(self._systemd, method)(SSH_UNIT, 'replace')
+        except dbus.exceptions.DBusException as e:
+            logging.warning(f"[SSH-WebTerm] D-Bus {method} failed, using systemctl: {e}")
+            return None
+        
+        # The call returns once the job is queued; its object vanishes when it completes
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                self._bus.get_object('org.freedesktop.systemd1', job).Get(
+                    'org.freedesktop.systemd1.Job', 'State',
+                    dbus_interface=dbus.PROPERTIES_IFACE)
+            except dbus.exceptions.DBusException:
+                break
+            time.sleep(0.1)
+        else:
+            logging.error(f"[SSH-WebTerm] D-Bus {method} job did not finish in {timeout:.0f}s")
+        return self._unit_active_state()
+
+    def _unit_active_state(self):
+        """ssh.service's ActiveState over D-Bus, or None if it can't be read"""
+        try:
+            unit = self._bus.get_object('org.freedesktop.systemd1', self._systemd.LoadUnit(SSH_UNIT))
+            return str(unit.Get('org.freedesktop.systemd1.Unit', 'ActiveState',
+                                dbus_interface=dbus.PROPERTIES_IFACE))
+        except dbus.exceptions.DBusException as e:
+            logging.debug(f"[SSH-WebTerm] D-Bus status query failed: {e}")
+            return None
+
+    def _check_ssh_status(self):
+        """Check SSH service status"""
+        if self._systemd is not None:
+            state = self._unit_active_state()
+            if state is not None:
+                return state == 'active'
+        
+        # A live pid in sshd's pidfile answers without forking
+        pid = self._read_sshd_pid()
+        if pid is not None:
+            try:
+                os.kill(pid, 0)
+                return True
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                return True
+        
+        try:
+            # is-active exits 0 only for an active unit
+            result = subprocess.run(
+                [self._systemctl, 'is-active', 'ssh'],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=False,
+                timeout=5
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+
+    def _read_sshd_pid(self):
+        """Main sshd pid from its pidfile, or None if there isn't one"""
+        try:
+            with open(SSHD_PID_FILE, 'rb') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _start_ssh_service(self):
+        """Start SSH service"""
+        try:
+            state = self._systemd_job('StartUnit')
+            if state is not None:
+                success = state == 'active'
+                if not success:
+                    logging.error(f"[SSH-WebTerm] start ssh finished with ActiveState={state}")
+            else:
+                result = subprocess.run(
+                    ['sudo', 'systemctl', 'start', 'ssh'], 
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    timeout=10
+                )
+                success = result.returncode == 0
+                if not success:
+                    stderr = result.stderr.decode(errors='replace').strip()
+                    logging.error(f"[SSH-WebTerm] systemctl start ssh failed: {stderr}")
+            if success:
+                logging.info("[SSH-WebTerm] SSH service started")
+                self.ssh_status = True
+                # Trust the transition rather than re-probing on the next tick
+                self._status_cache = {
+                    'ts': time.monotonic(),
+                    'status': True,
+                    'conns': self._status_cache['conns']
+                }
+            else:
+                self._status_cache['ts'] = 0.0
+            return success
+        except Exception as e:
+            logging.error(f"[SSH-WebTerm] Failed to start SSH: {e}")
+            return False
+
+    def _stop_ssh_service(self):
+        """Stop SSH service"""
+        try:
+            state = self._systemd_job('StopUnit')
+            if state is not None:
+                success = state in ('inactive', 'failed')
+                if not success:
+                    logging.error(f"[SSH-WebTerm] stop ssh finished with ActiveState={state}")
+            else:
+                result = subprocess.run(
+                    ['sudo', 'systemctl', 'stop', 'ssh'], 
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    timeout=10
+                )
+                success = result.returncode == 0
+                if not success:
+                    stderr = result.stderr.decode(errors='replace').strip()
+                    logging.error(f"[SSH-WebTerm] systemctl stop ssh failed: {stderr}")
+            if success:
+                logging.info("[SSH-WebTerm] SSH service stopped")
+                self.ssh_status = False
+                # Trust the transition rather than re-probing on the next tick
+                self._status_cache = {
+                    'ts': time.monotonic(),
+                    'status': False,
+                    'conns': self._status_cache['conns']
+                }
+            else:
+                self._status_cache['ts'] = 0.0
+            return success
+        except Exception as e:
+            logging.error(f"[SSH-WebTerm] Failed to stop SSH: {e}")
+            return False
+
+    def _read_proc_connections(self):
+        """Read established connections to local port 22, None if /proc is unavailable"""
+        connections = []
+        now = datetime.now().strftime('%H:%M:%S')
+        
+        for proc_path in PROC_NET_TCP:
+            try:
+                with open(proc_path) as f:
+                    next(f, None)  # column header
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) < 4 or fields[3] != TCP_ESTABLISHED:
+                            continue
+                        if not fields[1].endswith(':' + SSH_PORT_HEX):
+                            continue
+                        connections.append({
+                            'local': self._decode_proc_address(fields[1]),
+                            'remote': self._decode_proc_address(fields[2]),
+                            'time': now
+                        })
+            except OSError:
+                if proc_path == PROC_NET_TCP[0]:
+                    return None
+                # tcp6 is missing when IPv6 is disabled
+        
+        return connections
+
+    def _decode_proc_address(self, value):
+        """Decode a /proc/net/tcp 'HEXADDR:HEXPORT' field into 'addr:port'"""
+        host, port = value.split(':')
+        raw = bytes.fromhex(host)
+        port = int(port, 16)
+        
+        # Addresses are stored as host-order 32-bit words
+        if len(raw) == 4:
+            return f"{socket.inet_ntop(socket.AF_INET, raw[::-1])}:{port}"
+        raw = b''.join(raw[i:i + 4][::-1] for i in range(0, 16, 4))
+        return f"[{socket.inet_ntop(socket.AF_INET6, raw)}]:{port}"
+
+    def _get_ssh_uptime(self):
+        """Get SSH service uptime"""
+        # sshd's start time is fixed for a given pid, so it's computed once per pid
+        pid = self._read_sshd_pid()
+        if pid is not None:
+            if self._uptime_cache[0] == pid:
+                return self._uptime_cache[1]
+            started = self._proc_start_time(pid)
+            if started is not None:
+                # Same shape as systemd's ActiveEnterTimestamp, zone included
+                text = started.strftime('%a %Y-%m-%d %H:%M:%S %Z')
+                self._uptime_cache = (pid, text)
+                return text
+        
+        try:
+            result = subprocess.run(
+                [self._systemctl, 'show', 'ssh', '--property=ActiveEnterTimestamp'],
+                capture_output=True,
+                close_fds=False,
+                timeout=5
+            )
+            if result.returncode == 0:
+                return result.stdout.decode('ascii', 'replace').strip().split('=')[1]
+        except Exception:
+            pass
+        return "Unknown"
+
+    def _proc_start_time(self, pid):
+        """Aware local start time of ``pid`` from /proc, or None if it can't be read"""
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                stat = f.read()
+            with open('/proc/stat', 'rb') as f:
+                btime = next(int(line.split()[1]) for line in f if line.startswith(b'btime '))
+            # comm may contain spaces; starttime is field 22, the 20th after ')'
+            ticks = int(stat.rpartition(b')')[2].split()[19])
+        except (OSError, ValueError, IndexError, StopIteration):
+            return None
+        return datetime.fromtimestamp(btime + ticks / os.sysconf('SC_CLK_TCK')).astimezone()
+
+    def _render_dashboard(self):
+        """Render main dashboard"""
+        ssh_active, connections = self._cached_status()
+        active_terminals = len(self.terminal_manager.sessions)
+        
+        html = _DASHBOARD_TMPL.render(
+            pwnagotchi_name=self._name,
+            ssh_active=ssh_active,
+            connections=connections,
+            connection_count=len(connections),
+            terminal_count=active_terminals
+        ).encode('utf-8')
+        
+        # Live values, so compressed per request; level 6 is cheap for a few KB
+        headers = {'Vary': 'Accept-Encoding'}
+        if request.accept_encodings['gzip'] > 0:
+            html = gzip.compress(html, compresslevel=6, mtime=0)
+            headers['Content-Encoding'] = 'gzip'
+        return Response(html, mimetype='text/html', headers=headers)
+
+    def _render_terminal(self):
+        """Serve the terminal interface rendered in on_loaded"""
+        return _cached_response(self._terminal_page, 'text/html; charset=utf-8',
+                                self._terminal_etag, 'private, max-age=60', self._terminal_gz)
\ No newline at end of file